@@ -5,8 +5,9 @@
 
 import logging
 import math
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import NamedTuple, Sequence
+from typing import NamedTuple
 
 from ...._internal._math import is_close_to_zero
 from ....microgrid.component import BatteryData, InverterData
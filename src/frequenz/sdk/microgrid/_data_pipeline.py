@@ -16,7 +16,7 @@ import typing
 from collections import abc
 from dataclasses import dataclass
 
-from frequenz.channels import Broadcast, Sender
+from frequenz.channels import Anycast, Broadcast, Sender
 
 from ..actor._actor import Actor
 from ..microgrid.component import Component
@@ -47,14 +47,30 @@ if typing.TYPE_CHECKING:
     from ..timeseries.ev_charger_pool import EVChargerPool
     from ..timeseries.logical_meter import LogicalMeter
 
+_battery_pool_type: type[BatteryPool] | None = None
+"""The `BatteryPool` class, cached on first use.
+
+`battery_pool()` needs the class on every call, so it is imported lazily once
+(the import has to stay out of the module top level to break an import cycle)
+and reused from here afterwards.
+"""
+
 
 _REQUEST_RECV_BUFFER_SIZE = 500
-"""The maximum number of requests that can be queued in the request receiver.
+"""The fallback number of requests that can be queued in a request receiver.
 
-A larger buffer size means that the DataSourcing and Resampling actors don't drop
-requests and will be able to keep up with higher request rates in larger installations.
+Used only when the component graph is not available to scale the buffer to the
+size of the installation.  A larger buffer size means that the DataSourcing and
+Resampling actors don't drop requests and will be able to keep up with higher
+request rates in larger installations.
 """
 
+_MIN_REQUEST_RECV_BUFFER_SIZE = 128
+"""The smallest request buffer size used for small installations."""
+
+_MAX_REQUEST_RECV_BUFFER_SIZE = 8192
+"""The largest request buffer size used for very large installations."""
+
 
 @dataclass
 class _ActorInfo:
@@ -63,8 +79,16 @@ class _ActorInfo:
     actor: Actor
     """The actor instance."""
 
-    channel: Broadcast[ComponentMetricRequest]
-    """The request channel for the actor."""
+    channel: Anycast[ComponentMetricRequest]
+    """The request channel for the actor.
+
+    Requests are many-producer/single-consumer: all senders feed the one actor, so
+    an `Anycast` channel is used, which doesn't pay the per-receiver bookkeeping
+    of a `Broadcast` channel on every send.
+    """
+
+    sender: Sender[ComponentMetricRequest]
+    """A sender to the request channel, shared by all request producers."""
 
 
 class _DataPipeline:  # pylint: disable=too-many-instance-attributes
@@ -114,10 +138,45 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         self._power_managing_actor: _power_managing.PowerManagingActor | None = None
 
         self._logical_meter: LogicalMeter | None = None
-        self._ev_charger_pools: dict[frozenset[int], EVChargerPool] = {}
-        self._battery_pools: dict[frozenset[int], BatteryPoolReferenceStore] = {}
+        self._ev_charger_pools: dict[tuple[int, ...], EVChargerPool] = {}
+        self._battery_pools: dict[tuple[int, ...], BatteryPoolReferenceStore] = {}
         self._frequency_pool: dict[int, GridFrequency] = {}
 
+    @staticmethod
+    def _request_recv_buffer_size() -> int:
+        """Return the request channel buffer size to use for this installation.
+
+        The buffer is scaled with the number of components in the component graph,
+        so small installations don't pay for an oversized buffer and large ones
+        don't drop requests under bursts.
+
+        Returns:
+            The number of requests that can be queued in a request receiver.
+        """
+        try:
+            component_graph = connection_manager.get().component_graph
+        except RuntimeError:
+            return _REQUEST_RECV_BUFFER_SIZE
+        return max(
+            _MIN_REQUEST_RECV_BUFFER_SIZE,
+            min(_MAX_REQUEST_RECV_BUFFER_SIZE, 4 * len(component_graph.components())),
+        )
+
+    @staticmethod
+    def _make_pool_key(component_ids: abc.Set[int] | None) -> tuple[int, ...]:
+        """Return a hashable pool key for the given component ids.
+
+        A sorted tuple of ints hashes faster than a frozenset of the same ids and
+        needs no interning, so it is used as the dict key for the pool caches.
+
+        Args:
+            component_ids: The component ids to make a key from.
+
+        Returns:
+            A sorted tuple of the given component ids.
+        """
+        return tuple(sorted(component_ids)) if component_ids else ()
+
     def frequency(self, component: Component | None = None) -> GridFrequency:
         """Fetch the grid frequency for the microgrid.
 
@@ -131,13 +190,14 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         if component is None:
             component = GridFrequency.find_frequency_component()
 
-        if component.component_id in self._frequency_pool:
-            return self._frequency_pool[component.component_id]
+        component_id = component.component_id
+        if component_id in self._frequency_pool:
+            return self._frequency_pool[component_id]
 
         grid_frequency = GridFrequency(
             self._data_sourcing_request_sender(), self._channel_registry, component
         )
-        self._frequency_pool[component.component_id] = grid_frequency
+        self._frequency_pool[component_id] = grid_frequency
         return grid_frequency
 
     def logical_meter(self) -> LogicalMeter:
@@ -148,9 +208,9 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         Returns:
             A logical meter instance.
         """
-        from ..timeseries.logical_meter import LogicalMeter
-
         if self._logical_meter is None:
+            from ..timeseries.logical_meter import LogicalMeter
+
             self._logical_meter = LogicalMeter(
                 channel_registry=self._channel_registry,
                 resampler_subscription_sender=self._resampling_request_sender(),
@@ -173,14 +233,12 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         Returns:
             An EVChargerPool instance.
         """
-        from ..timeseries.ev_charger_pool import EVChargerPool
-
-        # We use frozenset to make a hashable key from the input set.
-        key: frozenset[int] = frozenset()
-        if ev_charger_ids is not None:
-            key = frozenset(ev_charger_ids)
+        # We use a sorted tuple to make a hashable key from the input set.
+        key = self._make_pool_key(ev_charger_ids)
 
         if key not in self._ev_charger_pools:
+            from ..timeseries.ev_charger_pool import EVChargerPool
+
             self._ev_charger_pools[key] = EVChargerPool(
                 channel_registry=self._channel_registry,
                 resampler_subscription_sender=self._resampling_request_sender(),
@@ -221,20 +279,24 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         Returns:
             A `BatteryPool` instance.
         """
-        from ..timeseries.battery_pool import BatteryPool
-        from ..timeseries.battery_pool._battery_pool_reference_store import (
-            BatteryPoolReferenceStore,
-        )
+        global _battery_pool_type  # pylint: disable=global-statement
+
+        if _battery_pool_type is None:
+            from ..timeseries.battery_pool import BatteryPool
+
+            _battery_pool_type = BatteryPool
 
         if not self._power_managing_actor:
             self._start_power_managing_actor()
 
-        # We use frozenset to make a hashable key from the input set.
-        key: frozenset[int] = frozenset()
-        if battery_ids is not None:
-            key = frozenset(battery_ids)
+        # We use a sorted tuple to make a hashable key from the input set.
+        key = self._make_pool_key(battery_ids)
 
         if key not in self._battery_pools:
+            from ..timeseries.battery_pool._battery_pool_reference_store import (
+                BatteryPoolReferenceStore,
+            )
+
             self._battery_pools[key] = BatteryPoolReferenceStore(
                 channel_registry=self._channel_registry,
                 resampler_subscription_sender=self._resampling_request_sender(),
@@ -251,7 +313,7 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
                 batteries_id=battery_ids,
             )
 
-        return BatteryPool(self._battery_pools[key], name, priority)
+        return _battery_pool_type(self._battery_pools[key], name, priority)
 
     def _start_power_managing_actor(self) -> None:
         """Start the power managing actor if it is not already running."""
@@ -325,21 +387,19 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         Returns:
             A Sender for sending requests to the data sourcing actor.
         """
-        from ..actor import DataSourcingActor
-
         if self._data_sourcing_actor is None:
-            channel: Broadcast[ComponentMetricRequest] = Broadcast(
-                "Data Pipeline: Data Sourcing Actor Request Channel"
+            from ..actor import DataSourcingActor
+
+            channel: Anycast[ComponentMetricRequest] = Anycast(
+                maxsize=self._request_recv_buffer_size()
             )
             actor = DataSourcingActor(
-                request_receiver=channel.new_receiver(
-                    maxsize=_REQUEST_RECV_BUFFER_SIZE
-                ),
+                request_receiver=channel.new_receiver(),
                 registry=self._channel_registry,
             )
-            self._data_sourcing_actor = _ActorInfo(actor, channel)
+            self._data_sourcing_actor = _ActorInfo(actor, channel, channel.new_sender())
             self._data_sourcing_actor.actor.start()
-        return self._data_sourcing_actor.channel.new_sender()
+        return self._data_sourcing_actor.sender
 
     def _resampling_request_sender(self) -> Sender[ComponentMetricRequest]:
         """Return a Sender for sending requests to the resampling actor.
@@ -349,23 +409,21 @@ class _DataPipeline:  # pylint: disable=too-many-instance-attributes
         Returns:
             A Sender for sending requests to the resampling actor.
         """
-        from ..actor import ComponentMetricsResamplingActor
-
         if self._resampling_actor is None:
-            channel: Broadcast[ComponentMetricRequest] = Broadcast(
-                "Data Pipeline: Component Metric Resampling Actor Request Channel"
+            from ..actor import ComponentMetricsResamplingActor
+
+            channel: Anycast[ComponentMetricRequest] = Anycast(
+                maxsize=self._request_recv_buffer_size()
             )
             actor = ComponentMetricsResamplingActor(
                 channel_registry=self._channel_registry,
                 data_sourcing_request_sender=self._data_sourcing_request_sender(),
-                resampling_request_receiver=channel.new_receiver(
-                    maxsize=_REQUEST_RECV_BUFFER_SIZE
-                ),
+                resampling_request_receiver=channel.new_receiver(),
                 config=self._resampler_config,
             )
-            self._resampling_actor = _ActorInfo(actor, channel)
+            self._resampling_actor = _ActorInfo(actor, channel, channel.new_sender())
             self._resampling_actor.actor.start()
-        return self._resampling_actor.channel.new_sender()
+        return self._resampling_actor.sender
 
     async def _stop(self) -> None:
         """Stop the data pipeline actors."""
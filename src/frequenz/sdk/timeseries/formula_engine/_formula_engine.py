@@ -14,7 +14,7 @@ from collections import deque
 from collections.abc import Callable
 from typing import Generic, TypeVar, Union, overload
 
-from frequenz.channels import Broadcast, Receiver
+from frequenz.channels import Broadcast, Receiver, Sender
 
 from ..._internal._asyncio import cancel_and_await
 from .. import Sample, Sample3Phase
@@ -38,7 +38,7 @@ from ._formula_steps import (
 )
 from ._tokenizer import TokenType
 
-_logger = logging.Logger(__name__)
+_logger = logging.getLogger(__name__)
 
 _operator_precedence = {
     "max": 0,
@@ -52,7 +52,11 @@ _operator_precedence = {
     "+": 8,
     ")": 9,
 }
-"""The dictionary of operator precedence for the shunting yard algorithm."""
+"""Precedence of incoming operator tokens for the shunting yard algorithm.
+
+Steps already on the build stack carry their precedence as an integer attribute,
+so this table is only used to look up the operator string being pushed.
+"""
 
 _CompositionType = Union[
     "FormulaEngine",
@@ -308,6 +312,7 @@ class FormulaEngine(
         self._builder: FormulaBuilder[QuantityT] = builder
         self._create_method = create_method
         self._channel: Broadcast[Sample[QuantityT]] = Broadcast(self._name)
+        self._sender: Sender[Sample[QuantityT]] = self._channel.new_sender()
 
     @classmethod
     def from_receiver(
@@ -372,7 +377,6 @@ class FormulaEngine(
         evaluator = FormulaEvaluator[QuantityT](
             self._name, steps, metric_fetchers, self._create_method
         )
-        sender = self._channel.new_sender()
         while True:
             try:
                 msg = await evaluator.apply()
@@ -384,7 +388,7 @@ class FormulaEngine(
                     "Formula application failed: %s. Error: %s", self._name, err
                 )
             else:
-                await sender.send(msg)
+                await self._sender.send(msg)
 
     def __str__(self) -> str:
         """Return a string representation of the formula.
@@ -404,6 +408,10 @@ class FormulaEngine(
     ) -> Receiver[Sample[QuantityT]]:
         """Create a new receiver that streams the output of the formula engine.
 
+        Every call creates a new channel subscription, so callers that consume the
+        stream repeatedly should create one receiver and keep iterating on it,
+        rather than calling this method in a loop.
+
         Args:
             name: An optional name for the receiver.
             max_size: The size of the receiver's buffer.
@@ -506,6 +514,7 @@ class FormulaEngine3Phase(
         self._name: str = name
         self._create_method = create_method
         self._channel: Broadcast[Sample3Phase[QuantityT]] = Broadcast(self._name)
+        self._sender: Sender[Sample3Phase[QuantityT]] = self._channel.new_sender()
         self._task: asyncio.Task[None] | None = None
         self._streams: tuple[
             FormulaEngine[QuantityT],
@@ -514,7 +523,6 @@ class FormulaEngine3Phase(
         ] = phase_streams
 
     async def _run(self) -> None:
-        sender = self._channel.new_sender()
         phase_1_rx = self._streams[0].new_receiver()
         phase_2_rx = self._streams[1].new_receiver()
         phase_3_rx = self._streams[2].new_receiver()
@@ -534,7 +542,7 @@ class FormulaEngine3Phase(
                 _logger.exception("FormulaEngine task cancelled: %s", self._name)
                 break
             else:
-                await sender.send(msg)
+                await self._sender.send(msg)
 
     def new_receiver(
         self, name: str | None = None, max_size: int = 50
@@ -607,12 +615,11 @@ class FormulaBuilder(Generic[QuantityT]):
             op_prec = _operator_precedence[oper]
             while self._build_stack:
                 prev_step = self._build_stack[-1]
-                if op_prec < _operator_precedence[repr(prev_step)]:
-                    break
-                if oper == ")" and repr(prev_step) == "(":
-                    self._build_stack.pop()
+                if op_prec < prev_step.precedence:
                     break
-                if repr(prev_step) == "(":
+                if isinstance(prev_step, OpenParen):
+                    if oper == ")":
+                        self._build_stack.pop()
                     break
                 self._steps.append(prev_step)
                 self._build_stack.pop()
@@ -47,7 +47,9 @@ class FormulaEnginePool:
         self._namespace = namespace
         self._channel_registry = channel_registry
         self._resampler_subscription_sender = resampler_subscription_sender
-        self._string_engines: dict[str, FormulaEngine[Quantity]] = {}
+        self._string_engines: dict[
+            tuple[str, ComponentMetricId], FormulaEngine[Quantity]
+        ] = {}
         self._power_engines: dict[str, FormulaEngine[Power]] = {}
         self._current_engines: dict[str, FormulaEngine3Phase[Current]] = {}
 
@@ -70,9 +72,10 @@ class FormulaEnginePool:
         Returns:
             A FormulaReceiver that streams values with the formulas applied.
         """
-        channel_key = formula + component_metric_id.value
-        if channel_key in self._string_engines:
-            return self._string_engines[channel_key]
+        channel_key = (formula, component_metric_id)
+        engine = self._string_engines.get(channel_key)
+        if engine is not None:
+            return engine
 
         builder = ResampledFormulaBuilder(
             self._namespace,
@@ -108,8 +111,9 @@ class FormulaEnginePool:
             FormulaEngine,
         )
 
-        if channel_key in self._power_engines:
-            return self._power_engines[channel_key]
+        cached_engine = self._power_engines.get(channel_key)
+        if cached_engine is not None:
+            return cached_engine
 
         engine = generator(
             self._namespace,
@@ -142,8 +146,9 @@ class FormulaEnginePool:
             FormulaEngine3Phase,
         )
 
-        if channel_key in self._current_engines:
-            return self._current_engines[channel_key]
+        cached_engine = self._current_engines.get(channel_key)
+        if cached_engine is not None:
+            return cached_engine
 
         engine = generator(
             self._namespace,
@@ -3,7 +3,7 @@
 
 """A post-fix formula evaluator that operates on `Sample` receivers."""
 
-import asyncio
+import math
 from collections.abc import Callable
 from datetime import datetime
 from math import isinf, isnan
@@ -11,7 +11,106 @@ from typing import Generic
 
 from .. import Sample
 from .._quantities import QuantityT
-from ._formula_steps import FormulaStep, MetricFetcher
+from ._formula_steps import (
+    Adder,
+    Clipper,
+    ConstantValue,
+    Consumption,
+    Divider,
+    FormulaStep,
+    Maximizer,
+    MetricFetcher,
+    Minimizer,
+    Multiplier,
+    OpenParen,
+    Production,
+    Subtractor,
+)
+
+_COMPILE_GLOBALS = {
+    "__builtins__": {},
+    "max": max,
+    "min": min,
+    "inf": math.inf,
+    "nan": math.nan,
+}
+"""The globals made available to compiled formula expressions."""
+
+
+def _compile_steps(  # pylint: disable=too-many-branches,too-many-return-statements
+    steps: list[FormulaStep],
+    fetchers: list[MetricFetcher[QuantityT]],
+) -> Callable[..., float] | None:
+    """Compile a post-fix step list into a single python function.
+
+    The step sequence is fixed once a formula is built, so instead of dispatching
+    on `FormulaStep` objects and pushing/popping an evaluation stack on every tick,
+    the steps can be folded once into a plain python expression that takes one
+    float argument per metric fetcher.
+
+    Args:
+        steps: Steps of the formula, in post-fix order.
+        fetchers: The metric fetchers of the formula, in the order their values will
+            be passed to the compiled function.
+
+    Returns:
+        A function evaluating the formula from one float per fetcher, or `None` if
+            the steps can't be compiled and the step-wise evaluation should be used
+            instead.
+    """
+    arg_names = {id(fetcher): f"m{pos}" for pos, fetcher in enumerate(fetchers)}
+    stack: list[str] = []
+    for step in steps:
+        if isinstance(step, MetricFetcher):
+            stack.append(arg_names[id(step)])
+        elif isinstance(step, ConstantValue):
+            stack.append(repr(step.value))
+        elif isinstance(step, OpenParen):
+            continue
+        elif isinstance(step, (Adder, Subtractor, Multiplier, Divider)):
+            if len(stack) < 2:
+                return None
+            val2 = stack.pop()
+            val1 = stack.pop()
+            stack.append(f"({val1} {step!r} {val2})")
+        elif isinstance(step, (Maximizer, Minimizer)):
+            if len(stack) < 2:
+                return None
+            val2 = stack.pop()
+            val1 = stack.pop()
+            stack.append(f"{step!r}({val1}, {val2})")
+        elif isinstance(step, Consumption):
+            if not stack:
+                return None
+            stack.append(f"max({stack.pop()}, 0)")
+        elif isinstance(step, Production):
+            if not stack:
+                return None
+            stack.append(f"max(-{stack.pop()}, 0)")
+        elif isinstance(step, Clipper):
+            if not stack:
+                return None
+            expr = stack.pop()
+            if step.min_value is not None:
+                expr = f"max({expr}, {step.min_value!r})"
+            if step.max_value is not None:
+                expr = f"min({expr}, {step.max_value!r})"
+            stack.append(expr)
+        else:
+            return None
+
+    # if the formula is correct, exactly one expression is left on the stack, and
+    # that is the formula result.
+    if len(stack) != 1 or not fetchers:
+        return None
+
+    args = ", ".join(arg_names.values())
+    func: Callable[..., float] = eval(  # pylint: disable=eval-used
+        compile(f"lambda {args}: {stack[0]}", "<formula>", "eval"),
+        _COMPILE_GLOBALS,
+    )
+    assert callable(func)
+    return func
 
 
 class FormulaEvaluator(Generic[QuantityT]):
@@ -37,11 +136,18 @@ class FormulaEvaluator(Generic[QuantityT]):
         self._name = name
         self._steps = steps
         self._metric_fetchers: dict[str, MetricFetcher[QuantityT]] = metric_fetchers
+        self._fetchers: list[MetricFetcher[QuantityT]] = list(metric_fetchers.values())
+        self._compiled_apply: Callable[..., float] | None = _compile_steps(
+            steps, self._fetchers
+        )
+        self._eval_stack: list[float] = []
+        self._last_values: list[float] | None = None
+        self._last_result: QuantityT | None = None
         self._first_run = True
         self._create_method: Callable[[float], QuantityT] = create_method
 
     async def _synchronize_metric_timestamps(
-        self, metrics: set[asyncio.Task[Sample[QuantityT] | None]]
+        self, samples: list[Sample[QuantityT] | None]
     ) -> datetime:
         """Synchronize the metric streams.
 
@@ -50,8 +156,8 @@ class FormulaEvaluator(Generic[QuantityT]):
         inputs are fetched.
 
         Args:
-            metrics: The finished tasks from the first `fetch_next` calls to all the
-                `MetricFetcher`s.
+            samples: The samples from the first `fetch_next` calls to all the
+                `MetricFetcher`s, in the same order as the fetchers.
 
         Returns:
             The timestamp of the latest metric value.
@@ -60,26 +166,20 @@ class FormulaEvaluator(Generic[QuantityT]):
             RuntimeError: when some streams have no value, or when the synchronization
                 of timestamps fails.
         """
-        metrics_by_ts: dict[datetime, list[str]] = {}
-        for metric in metrics:
-            result = metric.result()
-            name = metric.get_name()
-            if result is None:
-                raise RuntimeError(f"Stream closed for component: {name}")
-            metrics_by_ts.setdefault(result.timestamp, []).append(name)
-        latest_ts = max(metrics_by_ts)
+        pairs: list[tuple[datetime, MetricFetcher[QuantityT]]] = []
+        for fetcher, sample in zip(self._fetchers, samples):
+            if sample is None:
+                raise RuntimeError(f"Stream closed for component: {fetcher}")
+            pairs.append((sample.timestamp, fetcher))
+        latest_ts = max(timestamp for timestamp, _ in pairs)
 
         # fetch the metrics with non-latest timestamps again until we have the values
         # for the same ts for all metrics.
-        for metric_ts, names in metrics_by_ts.items():
-            if metric_ts == latest_ts:
-                continue
+        for metric_ts, fetcher in pairs:
             while metric_ts < latest_ts:
-                for name in names:
-                    fetcher = self._metric_fetchers[name]
-                    next_val = await fetcher.fetch_next()
-                    assert next_val is not None
-                    metric_ts = next_val.timestamp
+                next_val = await fetcher.fetch_next()
+                assert next_val is not None
+                metric_ts = next_val.timestamp
             if metric_ts > latest_ts:
                 raise RuntimeError(
                     "Unable to synchronize resampled metric timestamps, "
@@ -98,37 +198,50 @@ class FormulaEvaluator(Generic[QuantityT]):
             RuntimeError: if some samples didn't arrive, or if formula application
                 failed.
         """
-        eval_stack: list[float] = []
-        ready_metrics, pending = await asyncio.wait(
-            [
-                asyncio.create_task(fetcher.fetch_next(), name=name)
-                for name, fetcher in self._metric_fetchers.items()
-            ],
-            return_when=asyncio.ALL_COMPLETED,
-        )
+        # The fetchers all stream data from the same resampler, so after the first run,
+        # they are time-synchronized and can be awaited one after the other, without
+        # having to wrap them in tasks.
+        samples = [await fetcher.fetch_next() for fetcher in self._fetchers]
 
-        if pending or any(res.result() is None for res in iter(ready_metrics)):
+        if any(sample is None for sample in samples):
             raise RuntimeError(
                 f"Some resampled metrics didn't arrive, for formula: {self._name}"
             )
 
         if self._first_run:
-            metric_ts = await self._synchronize_metric_timestamps(ready_metrics)
+            metric_ts = await self._synchronize_metric_timestamps(samples)
         else:
-            sample = next(iter(ready_metrics)).result()
+            sample = samples[0]
             assert sample is not None
             metric_ts = sample.timestamp
 
-        for step in self._steps:
-            step.apply(eval_stack)
-
-        # if all steps were applied and the formula was correct, there should only be a
-        # single value in the evaluation stack, and that would be the formula result.
-        if len(eval_stack) != 1:
-            raise RuntimeError(f"Formula application failed: {self._name}")
+        values = [fetcher.value_as_float() for fetcher in self._fetchers]
 
-        res = eval_stack.pop()
-        if isnan(res) or isinf(res):
-            return Sample(metric_ts, None)
+        # In steady state (e.g. idling batteries) the inputs often don't change from
+        # one tick to the next, in which case the result from the previous tick can be
+        # reused.  NaN values never compare equal, so they always re-evaluate.
+        if values == self._last_values:
+            return Sample(metric_ts, self._last_result)
 
-        return Sample(metric_ts, self._create_method(res))
+        if self._compiled_apply is not None:
+            res = self._compiled_apply(*values)
+        else:
+            # Reuse a single evaluation stack, instead of allocating one per tick.
+            eval_stack = self._eval_stack
+            eval_stack.clear()
+            for step in self._steps:
+                step.apply(eval_stack)
+
+            # if all steps were applied and the formula was correct, there should only
+            # be a single value in the evaluation stack, and that would be the formula
+            # result.
+            if len(eval_stack) != 1:
+                raise RuntimeError(f"Formula application failed: {self._name}")
+
+            res = eval_stack.pop()
+
+        self._last_values = values
+        self._last_result = (
+            None if isnan(res) or isinf(res) else self._create_method(res)
+        )
+        return Sample(metric_ts, self._last_result)
@@ -22,6 +22,15 @@ class FormulaStep(ABC):
     from the stack and push its result back in.
     """
 
+    __slots__ = ()
+
+    precedence: int
+    """The precedence of the step, for the shunting yard algorithm.
+
+    Lower values bind tighter.  Only operator steps, which can end up on the build
+    stack while a formula is being built, have a precedence.
+    """
+
     @abstractmethod
     def __repr__(self) -> str:
         """Return a string representation of the step.
@@ -42,6 +51,10 @@ class FormulaStep(ABC):
 class Adder(FormulaStep):
     """A formula step for adding two values."""
 
+    __slots__ = ()
+
+    precedence = 8
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -65,6 +78,10 @@ class Adder(FormulaStep):
 class Subtractor(FormulaStep):
     """A formula step for subtracting one value from another."""
 
+    __slots__ = ()
+
+    precedence = 7
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -88,6 +105,10 @@ class Subtractor(FormulaStep):
 class Multiplier(FormulaStep):
     """A formula step for multiplying two values."""
 
+    __slots__ = ()
+
+    precedence = 6
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -111,6 +132,10 @@ class Multiplier(FormulaStep):
 class Divider(FormulaStep):
     """A formula step for dividing one value by another."""
 
+    __slots__ = ()
+
+    precedence = 5
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -134,6 +159,10 @@ class Divider(FormulaStep):
 class Maximizer(FormulaStep):
     """A formula step that represents the max function."""
 
+    __slots__ = ()
+
+    precedence = 0
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -157,6 +186,10 @@ class Maximizer(FormulaStep):
 class Minimizer(FormulaStep):
     """A formula step that represents the min function."""
 
+    __slots__ = ()
+
+    precedence = 1
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -184,6 +217,10 @@ class Consumption(FormulaStep):
     of the evaluation stack and 0.
     """
 
+    __slots__ = ()
+
+    precedence = 2
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -213,6 +250,10 @@ class Production(FormulaStep):
     of the evaluation stack and 0.
     """
 
+    __slots__ = ()
+
+    precedence = 3
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -241,6 +282,10 @@ class OpenParen(FormulaStep):
     Any OpenParen steps would get removed once a formula is built.
     """
 
+    __slots__ = ()
+
+    precedence = 4
+
     def __repr__(self) -> str:
         """Return a string representation of the step.
 
@@ -256,6 +301,8 @@ class OpenParen(FormulaStep):
 class ConstantValue(FormulaStep):
     """A formula step for inserting a constant value."""
 
+    __slots__ = ("_value",)
+
     def __init__(self, value: float) -> None:
         """Create a `ConstantValue` instance.
 
@@ -293,6 +340,8 @@ class ConstantValue(FormulaStep):
 class Clipper(FormulaStep):
     """A formula step for clipping a value between a minimum and maximum."""
 
+    __slots__ = ("_min_val", "_max_val")
+
     def __init__(self, min_val: float | None, max_val: float | None) -> None:
         """Create a `Clipper` instance.
 
@@ -346,6 +395,8 @@ class Clipper(FormulaStep):
 class MetricFetcher(Generic[QuantityT], FormulaStep):
     """A formula step for fetching a value from a metric Receiver."""
 
+    __slots__ = ("_name", "_stream", "_next_value", "_nones_are_zeros")
+
     def __init__(
         self,
         name: str,
@@ -410,23 +461,30 @@ class MetricFetcher(Generic[QuantityT], FormulaStep):
         """
         return self._name
 
-    def apply(self, eval_stack: list[float]) -> None:
-        """Push the latest value from the stream into the evaluation stack.
+    def value_as_float(self) -> float:
+        """Return the value of the latest fetched sample as a float.
 
-        Args:
-            eval_stack: An evaluation stack, to apply the formula step on.
+        `None`, NaN and infinite values are converted to `0.0` or NaN, depending on
+        whether the fetcher was created with `nones_are_zeros`.
+
+        Returns:
+            The value of the latest fetched sample, as a float.
 
         Raises:
-            RuntimeError: No next value available to append.
+            RuntimeError: No next value available.
         """
         if self._next_value is None:
             raise RuntimeError("No next value available to append.")
 
         next_value = self._next_value.value
         if next_value is None or next_value.isnan() or next_value.isinf():
-            if self._nones_are_zeros:
-                eval_stack.append(0.0)
-            else:
-                eval_stack.append(math.nan)
-        else:
-            eval_stack.append(next_value.base_value)
+            return 0.0 if self._nones_are_zeros else math.nan
+        return next_value.base_value
+
+    def apply(self, eval_stack: list[float]) -> None:
+        """Push the latest value from the stream into the evaluation stack.
+
+        Args:
+            eval_stack: An evaluation stack, to apply the formula step on.
+        """
+        eval_stack.append(self.value_as_float())
@@ -4,7 +4,10 @@
 """A logical meter for calculating high level metrics for a microgrid."""
 
 
-import uuid
+import itertools
+import os
+import time
+from functools import cached_property
 
 from frequenz.channels import Sender
 
@@ -22,6 +25,12 @@ from ..formula_engine._formula_generators import (
     PVPowerFormula,
 )
 
+_PROC_TOKEN = f"{os.getpid()}-{time.time_ns():x}"
+"""A token unique to this process, to namespace logical meters across processes."""
+
+_NAMESPACE_COUNTER = itertools.count()
+"""A counter to give each logical meter in this process a unique namespace."""
+
 
 class LogicalMeter:
     """A logical meter for calculating high level metrics in a microgrid.
@@ -90,10 +99,28 @@ class LogicalMeter:
         self._channel_registry = channel_registry
         self._resampler_subscription_sender = resampler_subscription_sender
 
-        # Use a randomly generated uuid to create a unique namespace name for the local
-        # meter to use when communicating with the resampling actor.
-        self._namespace = f"logical-meter-{uuid.uuid4()}"
-        self._formula_pool = FormulaEnginePool(
+    @cached_property
+    def _namespace(self) -> str:
+        """Return the namespace of this logical meter.
+
+        Returns:
+            A unique namespace name for the logical meter to use when communicating
+                with the resampling actor, created from a process-unique token and a
+                counter.
+        """
+        return f"logical-meter-{_PROC_TOKEN}-{next(_NAMESPACE_COUNTER)}"
+
+    @cached_property
+    def _formula_pool(self) -> FormulaEnginePool:
+        """Return the formula engine pool of this logical meter.
+
+        The pool (and the namespace uuid it is keyed with) is only created when a
+        formula is first requested, so unused `LogicalMeter` instances stay cheap.
+
+        Returns:
+            The formula engine pool.
+        """
+        return FormulaEnginePool(
             self._namespace,
             self._channel_registry,
             self._resampler_subscription_sender,
@@ -128,7 +155,7 @@ class LogicalMeter:
             formula, component_metric_id, nones_are_zeros=nones_are_zeros
         )
 
-    @property
+    @cached_property
     def grid_power(self) -> FormulaEngine[Power]:
         """Fetch the grid power for the microgrid.
 
@@ -143,14 +170,12 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream grid power.
         """
-        engine = self._formula_pool.from_power_formula_generator(
+        return self._formula_pool.from_power_formula_generator(
             "grid_power",
             GridPowerFormula,
         )
-        assert isinstance(engine, FormulaEngine)
-        return engine
 
-    @property
+    @cached_property
     def grid_current(self) -> FormulaEngine3Phase[Current]:
         """Fetch the grid power for the microgrid.
 
@@ -165,14 +190,12 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream grid current.
         """
-        engine = self._formula_pool.from_3_phase_current_formula_generator(
+        return self._formula_pool.from_3_phase_current_formula_generator(
             "grid_current",
             GridCurrentFormula,
         )
-        assert isinstance(engine, FormulaEngine3Phase)
-        return engine
 
-    @property
+    @cached_property
     def consumer_power(self) -> FormulaEngine[Power]:
         """Fetch the consumer power for the microgrid.
 
@@ -190,14 +213,12 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream consumer power.
         """
-        engine = self._formula_pool.from_power_formula_generator(
+        return self._formula_pool.from_power_formula_generator(
             "consumer_power",
             ConsumerPowerFormula,
         )
-        assert isinstance(engine, FormulaEngine)
-        return engine
 
-    @property
+    @cached_property
     def producer_power(self) -> FormulaEngine[Power]:
         """Fetch the producer power for the microgrid.
 
@@ -215,14 +236,12 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream producer power.
         """
-        engine = self._formula_pool.from_power_formula_generator(
+        return self._formula_pool.from_power_formula_generator(
             "producer_power",
             ProducerPowerFormula,
         )
-        assert isinstance(engine, FormulaEngine)
-        return engine
 
-    @property
+    @cached_property
     def pv_power(self) -> FormulaEngine[Power]:
         """Fetch the PV power in the microgrid.
 
@@ -237,14 +256,12 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream PV total power.
         """
-        engine = self._formula_pool.from_power_formula_generator(
+        return self._formula_pool.from_power_formula_generator(
             "pv_power",
             PVPowerFormula,
         )
-        assert isinstance(engine, FormulaEngine)
-        return engine
 
-    @property
+    @cached_property
     def chp_power(self) -> FormulaEngine[Power]:
         """Fetch the CHP power production in the microgrid.
 
@@ -259,13 +276,13 @@ class LogicalMeter:
         Returns:
             A FormulaEngine that will calculate and stream CHP power production.
         """
-        engine = self._formula_pool.from_power_formula_generator(
+        return self._formula_pool.from_power_formula_generator(
             "chp_power",
             CHPPowerFormula,
         )
-        assert isinstance(engine, FormulaEngine)
-        return engine
 
     async def stop(self) -> None:
         """Stop all formula engines."""
-        await self._formula_pool.stop()
+        # Don't materialize the formula pool at teardown if it was never used.
+        if "_formula_pool" in self.__dict__:
+            await self._formula_pool.stop()
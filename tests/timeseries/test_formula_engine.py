@@ -1,12 +1,16 @@
 # License: MIT
 # Copyright © 2022 Frequenz Energy-as-a-Service GmbH
 
+# pylint: disable=too-many-lines
+
 """Tests for the FormulaEngine and the Tokenizer."""
 
 import asyncio
+import math
 from collections.abc import Callable
 from datetime import datetime
 
+import pytest
 from frequenz.channels import Broadcast, Receiver
 
 from frequenz.sdk.timeseries import Sample
@@ -16,6 +20,10 @@ from frequenz.sdk.timeseries.formula_engine._formula_engine import (
     FormulaEngine,
     HigherOrderFormulaBuilder,
 )
+from frequenz.sdk.timeseries.formula_engine._formula_evaluator import (
+    FormulaEvaluator,
+    _compile_steps,
+)
 from frequenz.sdk.timeseries.formula_engine._tokenizer import (
     Token,
     Tokenizer,
@@ -873,6 +881,162 @@ class TestClipper:
         assert (await results_rx.receive()).value == Quantity(15.0)
 
 
+class TestFormulaCompilation:
+    """Tests for compiling formula steps into a single expression."""
+
+    def evaluate_both(  # pylint: disable=too-many-locals
+        self,
+        tokens: list[int | float | str | tuple[float | None, float | None]],
+        inputs: list[float | None],
+        *,
+        nones_are_zeros: bool = False,
+    ) -> tuple[float, float]:
+        """Evaluate a formula with the given inputs, compiled and step-wise.
+
+        Args:
+            tokens: In-fix formula tokens: an `int` pushes the metric with that
+                index, a `float` pushes a constant, a `str` pushes an operator and
+                a tuple pushes a clipper with those bounds.
+            inputs: One value per metric index, to evaluate the formula with.
+            nones_are_zeros: Whether to treat None values from the streams as 0s.
+
+        Returns:
+            A tuple of the results of the compiled and the step-wise evaluation.
+        """
+        builder = FormulaBuilder("test_compile", Quantity)
+        for token in tokens:
+            if isinstance(token, int):
+                builder.push_metric(
+                    f"#{token}",
+                    Broadcast[Sample[Quantity]](f"#{token}").new_receiver(),
+                    nones_are_zeros=nones_are_zeros,
+                )
+            elif isinstance(token, float):
+                builder.push_constant(token)
+            elif isinstance(token, str):
+                builder.push_oper(token)
+            else:
+                builder.push_clipper(*token)
+        steps, fetchers = builder.finalize()
+
+        now = datetime.now()
+        for name, fetcher in fetchers.items():
+            value = inputs[int(name[1:])]
+            fetcher._next_value = Sample(  # pylint: disable=protected-access
+                now, None if value is None else Quantity(value)
+            )
+
+        compiled = _compile_steps(steps, list(fetchers.values()))
+        assert compiled is not None
+        compiled_res = compiled(
+            *(fetcher.value_as_float() for fetcher in fetchers.values())
+        )
+
+        eval_stack: list[float] = []
+        for step in steps:
+            step.apply(eval_stack)
+        assert len(eval_stack) == 1
+        interpreted_res = eval_stack.pop()
+
+        if math.isnan(interpreted_res):
+            assert math.isnan(compiled_res)
+        else:
+            assert compiled_res == interpreted_res
+        return compiled_res, interpreted_res
+
+    async def test_arithmetic(self) -> None:
+        """Test that compiled arithmetic matches step-wise evaluation."""
+        compiled_res, _ = self.evaluate_both(
+            [0, "+", 2.0, "*", "(", 1, "-", 2, ")"],
+            [10.0, 12.0, 15.0],
+        )
+        assert compiled_res == 4.0
+
+        compiled_res, _ = self.evaluate_both(
+            [0, "/", 1, "-", 2, "*", 0],
+            [6.0, 12.0, 2.0],
+        )
+        assert compiled_res == -11.5
+
+    async def test_min_max(self) -> None:
+        """Test that compiled min/max matches step-wise evaluation."""
+        compiled_res, _ = self.evaluate_both(
+            [0, "max", 1, "min", 2],
+            [4.0, 6.0, 5.0],
+        )
+        assert compiled_res == 5.0
+
+    async def test_consumption_production(self) -> None:
+        """Test that compiled consumption/production match step-wise evaluation."""
+        compiled_res, _ = self.evaluate_both(
+            [0, "consumption", "+", 1, "production"],
+            [10.0, -12.0],
+        )
+        assert compiled_res == 22.0
+
+        compiled_res, _ = self.evaluate_both(
+            [0, "consumption", "+", 1, "production"],
+            [-10.0, 12.0],
+        )
+        assert compiled_res == 0.0
+
+    async def test_clipper(self) -> None:
+        """Test that compiled clippers match step-wise evaluation."""
+        compiled_res, _ = self.evaluate_both(
+            [0, "+", 1, (0.0, 100.0)],
+            [200.0, -10.0],
+        )
+        assert compiled_res == 200.0
+
+        compiled_res, _ = self.evaluate_both(
+            ["(", 0, "+", 1, ")", (0.0, 100.0)],
+            [200.0, -10.0],
+        )
+        assert compiled_res == 100.0
+
+        # Infinite clip bounds have to compile to expressions that can resolve
+        # `inf`, and should leave the value untouched.
+        compiled_res, _ = self.evaluate_both(
+            ["(", 0, "+", 1, ")", (float("-inf"), float("inf"))],
+            [200.0, -10.0],
+        )
+        assert compiled_res == 190.0
+
+    async def test_inf_nan_inputs(self) -> None:
+        """Test that infinite constants and NaN inputs evaluate identically."""
+        compiled_res, _ = self.evaluate_both(
+            [0, "*", float("inf")],
+            [2.0],
+        )
+        assert math.isinf(compiled_res)
+
+        # A `None` input with nones_are_zeros=False becomes NaN.
+        compiled_res, _ = self.evaluate_both(
+            [0, "+", 1],
+            [None, 5.0],
+        )
+        assert math.isnan(compiled_res)
+
+    async def test_invalid_steps_fall_back(self) -> None:
+        """Test that invalid step lists don't compile and fail step-wise."""
+        channels = [Broadcast[Sample[Quantity]](f"#{ctr}") for ctr in range(2)]
+        builder = FormulaBuilder("invalid", Quantity)
+        builder.push_metric("#0", channels[0].new_receiver(), nones_are_zeros=False)
+        builder.push_metric("#1", channels[1].new_receiver(), nones_are_zeros=False)
+        steps, fetchers = builder.finalize()
+
+        # Two metrics with no operator leave two values on the stack, so the
+        # steps can't compile, and the step-wise evaluation raises.
+        assert _compile_steps(steps, list(fetchers.values())) is None
+
+        evaluator = FormulaEvaluator("invalid", steps, fetchers, Quantity)
+        now = datetime.now()
+        for channel in channels:
+            await channel.new_sender().send(Sample(now, Quantity(1.0)))
+        with pytest.raises(RuntimeError):
+            await evaluator.apply()
+
+
 class TestFormulaOutputTyping:
     """Tests for the typing of the output of formulas."""
 